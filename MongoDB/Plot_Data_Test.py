@@ -1,16 +1,25 @@
+import os
+
 from pymongo import MongoClient
-import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime
 import numpy as np
 
+# Extra diagnostic queries only run when DEBUG is set in the environment
+DEBUG = bool(os.environ.get('DEBUG'))
+
+# One client per process: pymongo pools connections and is thread-safe,
+# so repeated runs skip the TLS handshake and topology discovery
+_CLIENT = None
+
 def connect_to_mongodb(connection_string="mongodb://localhost:27017/", database_name="your_database"):
-    """Connect to MongoDB and return database object"""
-    client = MongoClient(connection_string)
-    if not client:
-        raise ConnectionError("Failed to connect to MongoDB")
-    db = client[database_name]
-    return db
+    """Connect to MongoDB (lazily creating one shared client) and return database object"""
+    global _CLIENT
+    if _CLIENT is None:
+        # zstd wire compression shrinks the repetitive sensor JSON
+        # streamed by the data cursors (requires zstandard on the client)
+        _CLIENT = MongoClient(connection_string, maxPoolSize=50, compressors='zstd')
+    return _CLIENT[database_name]
 
 def get_user_input():
     """Get filtering criteria from user"""
@@ -26,48 +35,35 @@ def find_test_intervals(db, user, operation, trial_number):
     """Find test intervals based on marker in/out events"""
     metadata_collection = db['metadata']
 
-    # Query for marker events with specified criteria
-    query_in = {
+    # One query for both marker events: a single round-trip and a
+    # single server-side sort instead of two of each
+    query = {
         'message.info.user': user,
         'message.info.operation': operation,
-        'message.info.trial_number': trial_number,
-        'message.event': 'marker in'
-    }
-    query_out = {
-        'message.info.user': user,
-        'message.info.operation': operation,
-        'message.info.trial_number': str(int(trial_number)+1),
-        'message.event': 'marker out'
+        '$or': [
+            {
+                'message.info.trial_number': trial_number,
+                'message.event': 'marker in'
+            },
+            {
+                'message.info.trial_number': str(int(trial_number)+1),
+                'message.event': 'marker out'
+            }
+        ]
     }
-    print(f"[DEBUG] {metadata_collection.find(query_in)}")
-    print(f"[DEBUG] {metadata_collection.find(query_out)}")
-
-    markers = list(metadata_collection.find(query_in).sort('timestamp', 1))
-    markers += list(metadata_collection.find(query_out).sort('timestamp', 1))
-    if len(markers) == 2:
-        print(f"[DEBUG] Test number {query_in.get('message.info.trial_number')} found in the Data Base!")
-    else:
-        print(f"[ERROR] Information of test number {query_in.get('message.info.trial_number')} not found in the Data Base.")
-    # If no results, try broader queries for debugging
-    if not markers:
-        print("[DEBUG] Trying broader queries...")
+    if DEBUG:
+        print(f"[DEBUG] Marker query: {query}")
 
-        # Try just user filter
-        user_docs = list(metadata_collection.find({'message.info.user': user}).limit(5))
-        print(f"[DEBUG] Documents with user '{user}': {len(user_docs)}")
-
-        # Try just event filter
-        event_docs = list(metadata_collection.find({'message.event': {'$in': ['marker in', 'marker out']}}).limit(5))
-        print(f"[DEBUG] Documents with marker events: {len(event_docs)}")
-
-        # Show structure of any marker events found
-        if event_docs:
-            print(f"[DEBUG] Example marker event: {event_docs[0]}")
+    # Iterate the cursor directly instead of materializing list(...);
+    # only one server batch is resident at a time
+    cursor = metadata_collection.find(query).sort('timestamp', 1).batch_size(100)
 
     intervals = []
     start_time = None
+    marker_count = 0
 
-    for marker in markers:
+    for marker in cursor:
+        marker_count += 1
         event = marker['message']['event']
         timestamp = marker['timestamp']
         if event == 'marker in':
@@ -76,14 +72,45 @@ def find_test_intervals(db, user, operation, trial_number):
             intervals.append((start_time, timestamp))
             start_time = None
 
+    if marker_count == 2:
+        print(f"[DEBUG] Test number {trial_number} found in the Data Base!")
+    else:
+        print(f"[ERROR] Information of test number {trial_number} not found in the Data Base.")
+    # If no results, try broader queries for debugging (DEBUG only)
+    if marker_count == 0 and DEBUG:
+        print("[DEBUG] Trying broader queries...")
+
+        # count_documents with limit=1 short-circuits at the first match,
+        # which is all an existence probe needs
+
+        # Try just user filter
+        has_user = metadata_collection.count_documents(
+            {'message.info.user': user}, limit=1)
+        print(f"[DEBUG] Documents with user '{user}': {'yes' if has_user else 'no'}")
+
+        # Try just event filter
+        event_filter = {'message.event': {'$in': ['marker in', 'marker out']}}
+        has_events = metadata_collection.count_documents(event_filter, limit=1)
+        print(f"[DEBUG] Documents with marker events: {'yes' if has_events else 'no'}")
+
+        # Show structure of any marker events found
+        if has_events:
+            print(f"[DEBUG] Example marker event: {metadata_collection.find_one(event_filter)}")
+
     return intervals
 
-def get_arduino_data(db, intervals):
-    """Get arduino data for specified time intervals"""
+def process_data_for_plotting(db, intervals):
+    """Query arduino data per interval server-side and create relative time for plotting"""
     arduino_collection = db['arduino_01']
-    all_data = []
+
+    # Make sure the range queries below can use an index scan
+    arduino_collection.create_index([('timestamp', 1)])
+
+    rel_parts, c1_parts, c2_parts = [], [], []
 
     for start_time, end_time in intervals:
+        # Let MongoDB do both the interval filtering and the relative-time
+        # subtraction; the client receives three scalars per document
         query = {
             'timestamp': {
                 '$gte': start_time,
@@ -91,46 +118,104 @@ def get_arduino_data(db, intervals):
             }
         }
 
-        data = list(arduino_collection.find(query).sort('timestamp', 1))
-        all_data.extend(data)
-
-    return all_data
-
-def process_data_for_plotting(arduino_data, intervals):
-    """Process arduino data and create relative time for plotting"""
-    processed_data = []
-
-    for start_time, end_time in intervals:
-        interval_data = [
-            doc for doc in arduino_data
-            if start_time <= doc['timestamp'] <= end_time
+        pipeline = [
+            {'$match': query},
+            {'$sort': {'timestamp': 1}},
+            {'$project': {
+                '_id': 0,
+                'rel': {'$dateDiff': {
+                    'startDate': start_time,
+                    'endDate': '$timestamp',
+                    'unit': 'millisecond'
+                }},
+                'c1': '$message.data.Current_1',
+                'c2': '$message.data.Current_2'
+            }}
         ]
-
-        if interval_data:
-            # Create relative time from start of test
-            for doc in interval_data:
-                relative_time = (doc['timestamp'] - start_time).total_seconds()
-                processed_data.append({
-                    'relative_time': relative_time,
-                    'Current_1': doc['message']['data']['Current_1'],
-                    'Current_2': doc['message']['data']['Current_2'],
-                    'timestamp': doc['timestamp']
-                })
-
-    return processed_data
-
-def plot_current_data(processed_data):
+        cursor = arduino_collection.aggregate(pipeline, allowDiskUse=False)
+
+        # One pass into lists, one conversion at the end: sizing the arrays
+        # from a prior count_documents() raced with concurrent inserts and
+        # cost a second full range scan per interval
+        rel_l, c1_l, c2_l = [], [], []
+        for doc in cursor:
+            rel_l.append(doc['rel'])
+            c1_l.append(doc['c1'])
+            c2_l.append(doc['c2'])
+        if not rel_l:
+            continue
+
+        rel = np.asarray(rel_l, dtype=np.float64)
+        c1 = np.asarray(c1_l, dtype=np.float64)
+        c2 = np.asarray(c2_l, dtype=np.float64)
+
+        rel /= 1e3  # milliseconds → seconds, vectorized
+        rel_parts.append(rel)
+        c1_parts.append(c1)
+        c2_parts.append(c2)
+
+    if not rel_parts:
+        empty = np.empty(0, dtype=np.float64)
+        return empty, empty.copy(), empty.copy()
+
+    return (np.concatenate(rel_parts),
+            np.concatenate(c1_parts),
+            np.concatenate(c2_parts))
+
+def downsample_minmax(x, y, n_out=3000, threshold=5000):
+    """Reduce a long series to ~n_out points by keeping each bucket's min and max.
+
+    Matplotlib scales poorly past ~1e5 points; keeping the per-bucket
+    extremes preserves the visual envelope of the signal while cutting
+    memory and render time by orders of magnitude on long trials.
+    """
+    n = x.size
+    if n <= threshold:
+        return x, y
+
+    n_buckets = n_out // 2
+    # reshape the largest even prefix into buckets; the ragged remainder
+    # (up to n_buckets - 1 of the newest samples) becomes one extra bucket
+    # below so the plotted range always ends at the last sample
+    size = (n // n_buckets) * n_buckets
+    bx = x[:size].reshape(n_buckets, -1)
+    by = y[:size].reshape(n_buckets, -1)
+
+    lo = by.argmin(axis=1)
+    hi = by.argmax(axis=1)
+    # keep the two extremes of each bucket in time order
+    first  = np.minimum(lo, hi)
+    second = np.maximum(lo, hi)
+
+    rows = np.arange(n_buckets)
+    xs = np.empty(n_buckets * 2, dtype=x.dtype)
+    ys = np.empty(n_buckets * 2, dtype=y.dtype)
+    xs[0::2] = bx[rows, first];  xs[1::2] = bx[rows, second]
+    ys[0::2] = by[rows, first];  ys[1::2] = by[rows, second]
+
+    if size < n:
+        ty = y[size:]
+        lo_t = int(ty.argmin())
+        hi_t = int(ty.argmax())
+        f, s = (lo_t, hi_t) if lo_t <= hi_t else (hi_t, lo_t)
+        xs = np.concatenate([xs, x[size:][[f, s]]])
+        ys = np.concatenate([ys, ty[[f, s]]])
+    return xs, ys
+
+def plot_current_data(rel_time, c1, c2):
     """Plot Current_1 and Current_2 vs time"""
-    if not processed_data:
+    if rel_time.size == 0:
         print("No data found for the specified criteria.")
         return
 
-    df = pd.DataFrame(processed_data)
+    # Downsample long trials before handing them to matplotlib
+    x1, y1 = downsample_minmax(rel_time, c1)
+    x2, y2 = downsample_minmax(rel_time, c2)
 
     plt.figure(figsize=(12, 8))
 
     plt.subplot(2, 1, 1)
-    plt.plot(df['relative_time'], df['Current_1'], 'b-', linewidth=1, label='Current_1')
+    plt.plot(x1, y1, 'b-', linewidth=1, label='Current_1')
     plt.xlabel('Time (seconds)')
     plt.ylabel('Current_1 (A)')
     plt.title('Current_1 vs Time')
@@ -138,7 +223,7 @@ def plot_current_data(processed_data):
     plt.legend()
 
     plt.subplot(2, 1, 2)
-    plt.plot(df['relative_time'], df['Current_2'], 'r-', linewidth=1, label='Current_2')
+    plt.plot(x2, y2, 'r-', linewidth=1, label='Current_2')
     plt.xlabel('Time (seconds)')
     plt.ylabel('Current_2 (A)')
     plt.title('Current_2 vs Time')
@@ -150,8 +235,8 @@ def plot_current_data(processed_data):
 
     # Also plot both currents together
     plt.figure(figsize=(10, 6))
-    plt.plot(df['relative_time'], df['Current_1'], 'b-', linewidth=1, label='Current_1')
-    plt.plot(df['relative_time'], df['Current_2'], 'r-', linewidth=1, label='Current_2')
+    plt.plot(x1, y1, 'b-', linewidth=1, label='Current_1')
+    plt.plot(x2, y2, 'r-', linewidth=1, label='Current_2')
     plt.xlabel('Time (seconds)')
     plt.ylabel('Current (A)')
     plt.title('Current_1 and Current_2 vs Time')
@@ -186,21 +271,18 @@ def main():
         for i, (start, end) in enumerate(intervals, 1):
             print(f"\tInterval {i}: {start} to {end}")
 
-        # Get arduino data
+        # Retrieve and process arduino data (filtering happens server-side)
         print("[DEBUG] Retrieving arduino data...")
-        arduino_data = get_arduino_data(db, intervals)
+        rel_time, c1, c2 = process_data_for_plotting(db, intervals)
 
-        if not arduino_data:
+        if rel_time.size == 0:
             print("[ERROR] No arduino data found for the specified intervals.")
             return
 
-        print(f"[DEBUG] Retrieved {len(arduino_data)} data points.")
-
-        # Process data for plotting
-        processed_data = process_data_for_plotting(arduino_data, intervals)
+        print(f"[DEBUG] Retrieved {rel_time.size} data points.")
 
         # Plot the data
-        plot_current_data(processed_data)
+        plot_current_data(rel_time, c1, c2)
 
     except Exception as e:
         print(f"[ERROR] An error occurred: {e}")
@@ -13,8 +13,6 @@ Where python_source is the name of the agent (mads.ini), and source_arduino is t
 
 import json
 import time
-import random
-from datetime import datetime
 import serial
 
 # Declare this as a source agent
@@ -2,7 +2,7 @@ import os
 os.environ['QT_QPA_PLATFORM'] = 'xcb'
 
 import json
-from collections import deque
+import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 
@@ -22,14 +22,17 @@ def setup():
     max_len   = params.get("max_len", 20)
     view_len  = params.get("view_len", max_len)
     state['view_len'] = view_len
+    state['max_len']  = max_len
 
-    # ——— data buffers ———
+    # ——— data buffers: fixed-size ring buffers, zero allocation per packet ———
     keys = [
         't_data','X','Y','Z','magnitude','vibration',
         'sht31_temp','sht31_hum','dht_temp','dht_hum','sound_level'
     ]
     for k in keys:
-        state[k] = deque(maxlen=max_len)
+        state[k] = np.zeros(max_len, dtype=np.float64)
+    state['head']  = 0
+    state['count'] = 0
 
     # ——— matplotlib + GridSpec setup ———
     plt.ion()
@@ -83,92 +86,153 @@ def setup():
     axes[4].set_xlabel('Time (ms)')
     axes[4].legend(loc='upper left')
 
+    # animated: excluded from full draws so the cached backgrounds stay
+    # line-free; repainted via draw_artist/blit every packet
+    for line in lines:
+        line.set_animated(True)
     state['lines'] = lines
 
+    # ——— build the values table once; only the cell texts change later ———
+    labels = [
+        'X','Y','Z','Magnitude','Vibration',
+        'SHT31 Temp','DHT Temp','SHT31 Hum','DHT Hum','Sound'
+    ]
+    tbl = table_ax.table(
+        cellText=[['0.00'] * len(labels)],
+        colLabels=labels,
+        loc='center'
+    )
+    tbl.auto_set_font_size(False)
+    tbl.set_fontsize(10)
+    tbl.scale(1, 1.5)
+    # animated: excluded from full draws, repainted via draw_artist/blit
+    tbl.set_animated(True)
+    state['tbl']   = tbl
+    state['cells'] = [tbl[(1, j)] for j in range(len(labels))]
+
     fig.tight_layout()
+    # lock the layout: no further text-extent measuring passes can be
+    # triggered from the per-packet path
+    fig.set_layout_engine('none')
+    for ax in axes:
+        ax.use_sticky_edges = False
     fig.show()
 
+    # render once and cache the static backgrounds (axes, ticks, legends)
+    # so the per-packet path can blit only the line and table artists
+    fig.canvas.draw()
+    state['bgs'] = [fig.canvas.copy_from_bbox(ax.bbox) for ax in axes]
+    state['table_bg'] = fig.canvas.copy_from_bbox(table_ax.bbox)
+
 
 def deal_with_data():
     """
     Called whenever a new data packet arrives.
     Updates buffers, redraws lines, adjusts axes and the values table.
     """
-    try:
-        t = data['millis']
-        d = data['data']
-    except (KeyError, TypeError):
+    # single .get early-exit instead of try/except around hashed lookups
+    d = data.get('data') if isinstance(data, dict) else None
+    if d is None:
         return
-
-    # append to deques
-    state['t_data'].append(t)
-    state['X'].append(d['X']);    state['Y'].append(d['Y']);    state['Z'].append(d['Z'])
-    state['magnitude'].append(d['magnitude'])
-    state['vibration'].append(d['vibration'])
-    state['sht31_temp'].append(d['sht31_temperature'])
-    state['sht31_hum'].append(d['sht31_humidity'])
-    state['dht_temp'].append(d['dht_temperature'])
-    state['dht_hum'].append(d['dht_humidity'])
-    state['sound_level'].append(d['sound_level'])
-
-    # prepare display window (only the last view_len samples)
-    times = list(state['t_data'])
-    n     = len(times)
-    v     = state['view_len']
-    start = max(0, n - v)
-    t_win = times[start:]
-
-    # update each line in the plot
-    idx = 0
-    def upd(series):
-        nonlocal idx
-        vals = list(series)[start:]
-        state['lines'][idx].set_data(t_win, vals)
-        idx += 1
-
-    for series in (
-        state['X'], state['Y'], state['Z'],
-        state['magnitude'], state['vibration'],
-        state['sht31_temp'], state['dht_temp'],
-        state['sht31_hum'], state['dht_hum'],
-        state['sound_level'],
-    ):
-        upd(series)
-
-    # adjust axes limits
-    if t_win:
+    t = data.get('millis')
+    if t is None:
+        return  # a defaulted t=0 would collapse the x-window
+    get = d.get  # bind once; reused for every channel below
+
+    # write into the ring buffers
+    head    = state['head']
+    max_len = state['max_len']
+    state['t_data'][head] = t
+    state['X'][head] = get('X', 0.0);  state['Y'][head] = get('Y', 0.0);  state['Z'][head] = get('Z', 0.0)
+    state['magnitude'][head] = get('magnitude', 0.0)
+    state['vibration'][head] = get('vibration', 0.0)
+    state['sht31_temp'][head] = get('sht31_temperature', 0.0)
+    state['sht31_hum'][head] = get('sht31_humidity', 0.0)
+    state['dht_temp'][head] = get('dht_temperature', 0.0)
+    state['dht_hum'][head] = get('dht_humidity', 0.0)
+    state['sound_level'][head] = get('sound_level', 0.0)
+    state['head']  = (head + 1) % max_len
+    state['count'] = min(state['count'] + 1, max_len)
+
+    # oldest→newest index of the last view_len samples, computed once
+    n   = min(state['count'], state['view_len'])
+    idx = (np.arange(n) + state['head'] - n) % max_len
+    t_win = state['t_data'][idx]
+
+    # update each line in the plot (same order the lines were created in)
+    for line, key in zip(state['lines'], (
+        'X', 'Y', 'Z',
+        'magnitude', 'vibration',
+        'sht31_temp', 'dht_temp',
+        'sht31_hum', 'dht_hum',
+        'sound_level',
+    )):
+        line.set_data(t_win, state[key][idx])
+
+    # adjust axes limits; a changed limit invalidates the cached background
+    canvas = state['fig'].canvas
+    full_redraw = False
+    if n:
         xmin, xmax = t_win[0], t_win[-1]
-        for ax in state['axes']:
-            ax.set_xlim(xmin, xmax)
-            ax.relim()
-            ax.autoscale_view()
-
-    # — update table with the latest values —
-    labels = [
-        'X','Y','Z','Magnitude','Vibration',
-        'SHT31 Temp','DHT Temp','SHT31 Hum','DHT Hum','Sound'
-    ]
-    latest = [
-        state['X'][-1], state['Y'][-1], state['Z'][-1],
-        state['magnitude'][-1], state['vibration'][-1],
-        state['sht31_temp'][-1], state['dht_temp'][-1],
-        state['sht31_hum'][-1], state['dht_hum'][-1],
-        state['sound_level'][-1]
-    ]
-
-    ax_table = state['table_ax']
-    ax_table.clear()
-    ax_table.axis('off')
-
-    tbl = ax_table.table(
-        cellText=[[f"{v:.2f}" for v in latest]],
-        colLabels=labels,
-        loc='center'
+        # which series live on which axis (same layout as setup)
+        groups = (
+            ('X', 'Y', 'Z'),
+            ('magnitude', 'vibration'),
+            ('sht31_temp', 'dht_temp'),
+            ('sht31_hum', 'dht_hum'),
+            ('sound_level',),
+        )
+        span = max(xmax - xmin, 1.0)
+        for ax, group in zip(state['axes'], groups):
+            cur_lo, cur_hi = ax.get_xlim()
+            if xmax > cur_hi or xmin < cur_lo:
+                # step the window a quarter-span ahead so consecutive
+                # packets share limits and the blit path can engage
+                ax.set_xlim(xmin, xmax + 0.25 * span)
+                full_redraw = True
+
+            # y-limits straight from the ring-buffer extremes — no
+            # relim() walk over every artist's data — widened only
+            # when a value falls outside the current view
+            ymin = min(state[k][idx].min() for k in group)
+            ymax = max(state[k][idx].max() for k in group)
+            pad  = 0.05 * (ymax - ymin) or 0.5
+            cur_lo, cur_hi = ax.get_ylim()
+            if ymin < cur_lo or ymax > cur_hi:
+                ax.set_ylim(ymin - pad, ymax + pad)
+                full_redraw = True
+
+    # — update table cell texts in place (no artist rebuild) —
+    latest = (
+        state['X'][head], state['Y'][head], state['Z'][head],
+        state['magnitude'][head], state['vibration'][head],
+        state['sht31_temp'][head], state['dht_temp'][head],
+        state['sht31_hum'][head], state['dht_hum'][head],
+        state['sound_level'][head]
     )
-    tbl.auto_set_font_size(False)
-    tbl.set_fontsize(10)
-    tbl.scale(1, 1.5)
+    for cell, v in zip(state['cells'], latest):
+        cell.get_text().set_text(f"{v:.2f}")
 
     # draw on the GUI
-    state['fig'].canvas.draw()
-    state['fig'].canvas.flush_events()
+    if full_redraw:
+        # full render (animated artists excluded), then re-cache the
+        # line-free backgrounds for the blit path
+        canvas.draw()
+        state['bgs'] = [canvas.copy_from_bbox(ax.bbox) for ax in state['axes']]
+        state['table_bg'] = canvas.copy_from_bbox(state['table_ax'].bbox)
+    else:
+        # restore the static background
+        for bg in state['bgs']:
+            canvas.restore_region(bg)
+    # the lines are animated, so they are repainted over the background
+    # on both paths
+    for line in state['lines']:
+        line.axes.draw_artist(line)
+    for ax in state['axes']:
+        canvas.blit(ax.bbox)
+
+    # the table is animated, so it is repainted over its background
+    canvas.restore_region(state['table_bg'])
+    state['table_ax'].draw_artist(state['tbl'])
+    canvas.blit(state['table_ax'].bbox)
+    canvas.flush_events()
@@ -13,12 +13,34 @@ Where `python_sink` is the name of the agent (mads.ini),
 and `sink_arduino_gui` is the name of the script (.py).
 '''
 
+import functools
 import json
 import os
+import sys
 from pyfiglet import Figlet
 
 agent_type = "sink"
 
+# ANSI: cursor home + clear screen (no shell fork per packet)
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+
+def render_line(text):
+    """
+    Compose one big-ASCII line by stamping pre-rendered glyphs
+    side by side, instead of re-running pyfiglet's per-call
+    character-grid composition. Unknown characters are rendered
+    once and added to the glyph table.
+    """
+    glyphs = state['glyphs']
+    cols = []
+    for c in text:
+        rows = glyphs.get(c)
+        if rows is None:
+            rows = state['figlet'].renderText(c).splitlines()
+            glyphs[c] = rows
+        cols.append(rows)
+    return '\n'.join(''.join(parts) for parts in zip(*cols))
+
 def setup():
     """
     Called once at startup.
@@ -28,6 +50,21 @@ def setup():
     font_name = params.get("font", "big")
     state['figlet'] = Figlet(font=font_name)
 
+    # Pre-bake the rows of every character the readings can contain,
+    # so the hot path is O(chars) string joins, not pyfiglet rendering
+    state['glyphs'] = {
+        c: state['figlet'].renderText(c).splitlines()
+        for c in "0123456789.:-I "
+    }
+    # Rendering is deterministic in the input string, and the 2-decimal
+    # formatting collapses many readings onto the same text, so memoize
+    state['render'] = functools.lru_cache(maxsize=4096)(render_line)
+
+    # On Windows this one-time call enables VT escape processing so the
+    # ANSI clear sequence works in the console
+    if os.name == 'nt':
+        os.system('')
+
 def deal_with_data():
     """
     Called on every incoming packet.
@@ -43,8 +80,8 @@ def deal_with_data():
         ("I3", float(payload.get("I3", 0.0))),
     ]
 
-    # clear terminal
-    os.system('cls' if os.name == 'nt' else 'clear')
+    # clear terminal (escape sequence: no fork/exec of a shell)
+    sys.stdout.write(CLEAR_SCREEN)
 
     # header
     print(f"Timestamp: {t} ms\n")
@@ -52,4 +89,4 @@ def deal_with_data():
     # render each channel + value
     for name, val in readings:
         line = f"{name}: {val:.2f}"
-        print(state['figlet'].renderText(line))
\ No newline at end of file
+        print(state['render'](line))
\ No newline at end of file
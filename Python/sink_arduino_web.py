@@ -1,6 +1,6 @@
 '''
 This script implements a web-based dashboard to display real-time current readings from an Arduino device.
-It uses Flask to serve a simple HTML page that updates the readings every 250 milliseconds.
+It uses Flask to serve a simple HTML page whose readings are pushed over Server-Sent Events.
 It expects the data to be in a specific format, with readings for three channels (I1, I2, I3).
 
 To run this script, use the following command:
@@ -9,10 +9,15 @@ To run this script, use the following command:
 Where python_sink is the name of the agent (mads.ini), and sink_arduino_web is the name of the script (.py).
 '''
 
+import gzip
 import json
-import threading
-from datetime import datetime
-from flask import Flask, jsonify, render_template_string
+import math
+import multiprocessing
+import struct
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from flask import Flask, Response, request
 
 # === Agent configuration (injected by MADS) ===
 agent_type = "sink"
@@ -20,13 +25,27 @@ agent_type = "sink"
 #topic = None
 #data = {}
 
-# === Shared state for the latest readings ===
-latest_readings = {
-    "I1": 0.0,
-    "I2": 0.0,
-    "I3": 0.0,
-    "timestamp": ""
-}
+# === Shared memory between the sink and the web server process ===
+# Flask runs in its own process (its own interpreter, its own GIL) so
+# serving dashboard clients can never add jitter to the MADS data loop.
+# The readings cross over through a tiny shared-memory block:
+#   offset 0: uint64 sequence number, bumped after each complete write
+#   offset 8: three float32 channel readings + float64 epoch timestamp
+# Each field is one aligned word, so writes are atomic; readers detect a
+# new packet by watching the sequence number.
+_SHM_SIZE = 32
+_SEQ_FMT = "<Q"
+_DATA_FMT = "<3fd"
+_DATA_OFFSET = 8
+_shm = None   # parent: created in setup(); child: attached in run_web_server()
+_seq = 0
+
+# Reused conversion buffer: one Python→C crossing per packet instead of
+# three float() casts; float32 is plenty for sensor readings
+_readings_buf = np.empty(3, dtype=np.float32)
+
+# In-place gain for firmware that emits raw ADC counts (1.0 = already amps)
+ADC_SCALE = 1.0
 
 # === HTML template with embedded CSS & JS ===
 PAGE_TEMPLATE = """
@@ -91,20 +110,34 @@ PAGE_TEMPLATE = """
     }
   </style>
   <script>
-    async function fetchData() {
+    function applyData(json) {
+      document.getElementById('i1').textContent = json.I1.toFixed(2);
+      document.getElementById('i2').textContent = json.I2.toFixed(2);
+      document.getElementById('i3').textContent = json.I3.toFixed(2);
+      document.getElementById('ts').textContent = json.timestamp;
+    }
+    let source = null;
+    function connect() {
+      if (source) return;
+      source = new EventSource('/stream');
+      source.onmessage = e => applyData(JSON.parse(e.data));
+    }
+    function disconnect() {
+      if (source) { source.close(); source = null; }
+    }
+    // pause the stream while the tab is hidden
+    document.addEventListener('visibilitychange', () => {
+      if (document.visibilityState === 'visible') { connect(); } else { disconnect(); }
+    });
+    window.addEventListener('load', async () => {
       try {
         const res = await fetch('/api/readings');
-        const json = await res.json();
-        document.getElementById('i1').textContent = json.I1.toFixed(2);
-        document.getElementById('i2').textContent = json.I2.toFixed(2);
-        document.getElementById('i3').textContent = json.I3.toFixed(2);
-        document.getElementById('ts').textContent = json.timestamp;
+        applyData(await res.json());
       } catch (err) {
         console.error("Failed to fetch data:", err);
       }
-    }
-    setInterval(fetchData, 250);
-    window.addEventListener('load', fetchData);
+      connect();
+    });
   </script>
 </head>
 <body>
@@ -134,43 +167,142 @@ PAGE_TEMPLATE = """
 </html>
 """
 
+# The page has no template variables, so render it once at import time
+# and keep a pre-gzipped copy for browsers that accept it
+_INDEX_HTML = PAGE_TEMPLATE.encode("utf-8")
+_INDEX_GZ = gzip.compress(_INDEX_HTML, 6)
+
 # === Flask application ===
 app = Flask(__name__)
 
 @app.route('/')
 def index():
-    return render_template_string(PAGE_TEMPLATE)
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        return Response(_INDEX_GZ, mimetype='text/html',
+                        headers={'Content-Encoding': 'gzip',
+                                 'Cache-Control': 'public, max-age=3600'})
+    return Response(_INDEX_HTML, mimetype='text/html',
+                    headers={'Cache-Control': 'public, max-age=3600'})
+
+# strftime goes through the C locale layer on every call; the display
+# only has 1 s resolution, so format at most once per wall-clock second
+_last_sec = -1
+_last_ts = b""
+
+def _format_ts(epoch):
+    global _last_sec, _last_ts
+    sec = int(epoch)
+    if sec != _last_sec:
+        _last_sec = sec
+        _last_ts = time.strftime("%H:%M:%S", time.localtime(sec)).encode()
+    return _last_ts
+
+# The response shape is fixed, so instead of encoding a dict per request
+# the web process keeps one preformatted blob and patches only the value
+# slices in place. Numbers are fixed-width (%8.3f) so offsets never shift;
+# JSON permits the padding spaces after the colon.
+_blob = bytearray(b'{"I1":   0.000,"I2":   0.000,"I3":   0.000,"timestamp":"--:--:--"}')
+_I1_OFF = _blob.index(b'"I1":') + 5
+_I2_OFF = _blob.index(b'"I2":') + 5
+_I3_OFF = _blob.index(b'"I3":') + 5
+_TS_OFF = _blob.index(b'"timestamp":"') + 13
+_blob_seq = -1
+
+def _fmt_val(v):
+    # inf/nan format to 8-byte-wide tokens that pass the width check but
+    # are not JSON (a float32 reading overflows to inf from ~1e39 up), so
+    # non-finite values must be clamped before looking at the width
+    if not math.isfinite(v):
+        return b"9999.999" if v > 0 else b"-999.999"
+    out = b"%8.3f" % v
+    # a reading too wide for the slot would shift every offset after it;
+    # clamp to the widest representable value
+    return out if len(out) == 8 else (b"9999.999" if v > 0 else b"-999.999")
+
+def _read_shm():
+    """Refresh the blob from shared memory; returns (sequence, JSON bytes)."""
+    global _blob_seq
+    seq, = struct.unpack_from(_SEQ_FMT, _shm.buf, 0)
+    if seq != _blob_seq:
+        i1, i2, i3, epoch = struct.unpack_from(_DATA_FMT, _shm.buf, _DATA_OFFSET)
+        _blob[_I1_OFF:_I1_OFF + 8] = _fmt_val(i1)
+        _blob[_I2_OFF:_I2_OFF + 8] = _fmt_val(i2)
+        _blob[_I3_OFF:_I3_OFF + 8] = _fmt_val(i3)
+        if epoch:
+            _blob[_TS_OFF:_TS_OFF + 8] = _format_ts(epoch)
+        _blob_seq = seq
+    return seq, bytes(_blob)
+
+# Each open stream occupies one server worker thread, so streams must be
+# finite: after this many events the generator ends and the browser's
+# EventSource reconnects on its own, returning the thread to the pool
+# instead of letting a few tabs starve every other route.
+_STREAM_MAX_EVENTS = 120
+
+@app.route('/stream')
+def stream():
+    """Server-Sent Events: pushed only when a new packet actually arrives."""
+    def event_stream():
+        last_seq = -1
+        yield b"retry: 250\n\n"  # reconnect quickly when we hang up
+        for _ in range(_STREAM_MAX_EVENTS):
+            # a 5 s cap doubles as a keep-alive heartbeat
+            deadline = time.monotonic() + 5.0
+            while time.monotonic() < deadline:
+                seq, = struct.unpack_from(_SEQ_FMT, _shm.buf, 0)
+                if seq != last_seq:
+                    break
+                time.sleep(0.05)
+            last_seq, blob = _read_shm()
+            yield b"data: " + blob + b"\n\n"
+    return Response(event_stream(), mimetype='text/event-stream')
 
 @app.route('/api/readings')
 def api_readings():
-    return jsonify(latest_readings)
+    _, blob = _read_shm()
+    return app.response_class(blob, mimetype="application/json")
 
-def run_web_server():
-    app.run(host='localhost', port=5000, debug=False)
+def run_web_server(shm_name):
+    global _shm
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # Production WSGI server: a small thread pool serves concurrent
+        # dashboard clients instead of Werkzeug's single-threaded dev loop
+        from waitress import serve
+        serve(app, host='localhost', port=5000, threads=8, _quiet=True)
+    except ImportError:
+        print("[Python] waitress not installed; falling back to the Flask dev server")
+        app.run(host='localhost', port=5000, debug=False)
 
 # === MADS agent hooks ===
 def setup():
+    global _shm
     print("[Python] Starting web dashboard sink...")
     print("[Python] Parameters:", json.dumps(params))
     print("[Python] Topic:", topic)
-    threading.Thread(target=run_web_server, daemon=True).start()
+    _shm = shared_memory.SharedMemory(create=True, size=_SHM_SIZE)
+    multiprocessing.Process(target=run_web_server, args=(_shm.name,),
+                            daemon=True).start()
     print("[Python] Open your browser at http://<server_ip>:5000")
 
 def deal_with_data():
-    global latest_readings
+    global _seq
     try:
         payload = data.get('data', {})
-        i1 = float(payload.get('I1', 0.0))
-        i2 = float(payload.get('I2', 0.0))
-        i3 = float(payload.get('I3', 0.0))
+        # single fused assignment into the preallocated buffer
+        _readings_buf[:] = (payload.get('I1', 0.0),
+                            payload.get('I2', 0.0),
+                            payload.get('I3', 0.0))
     except Exception as e:
         print("[Python] Error parsing data:", e)
         return
 
-    # Update shared state
-    latest_readings = {
-        "I1": i1,
-        "I2": i2,
-        "I3": i3,
-        "timestamp": datetime.now().strftime("%H:%M:%S")
-    }
\ No newline at end of file
+    if ADC_SCALE != 1.0:
+        _readings_buf *= ADC_SCALE
+    i1, i2, i3 = _readings_buf.tolist()
+
+    # Publish: readings first, sequence number last, so a reader that
+    # sees the new sequence is guaranteed to see the new readings
+    _seq += 1
+    struct.pack_into(_DATA_FMT, _shm.buf, _DATA_OFFSET, i1, i2, i3, time.time())
+    struct.pack_into(_SEQ_FMT, _shm.buf, 0, _seq)
\ No newline at end of file